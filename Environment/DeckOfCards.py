@@ -26,6 +26,10 @@ class DeckOfCards:
                 cards.append(Card(suit, value))
         return cards
 
+CARD_VALUES = "23456789TJQKA"
+CARD_SUITS = "SHDC"
+
+
 class Card:
     def __init__(self, suit, value):
         self.suit = suit
@@ -40,5 +44,11 @@ class Card:
     def get_value(self):
         return self.value
 
+    def to_int(self):
+        """
+        :return: Compact 0-51 encoding of the card (rank * 4 + suit), handy for columnar storage.
+        """
+        return CARD_VALUES.index(self.value) * 4 + CARD_SUITS.index(self.suit)
+
     def __copy__(self):
         return Card(self.suit, self.value)
\ No newline at end of file
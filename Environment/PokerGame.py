@@ -13,15 +13,19 @@ class BettingRound(Enum):
     RIVER = 4
     SHOWDOWN = 5
 
+# Action type -> code used in the betting history passed to deciders
+BETTING_HISTORY_CODES = {"fold": "f", "check": "c", "call": "c", "raise": "r"}
+
 class PokerGame:
     def __init__(self, players,  hand_evaluator, num_of_deck=1,
-                 small_blind=10, big_blind=20):
+                 small_blind=10, big_blind=20, verbose=True):
         """
         :param players: list of Player objects
         :param deck: a DeckOfCards instance
         :param hand_evaluator: a HandEvaluator instance
         :param small_blind: the amount for the small blind
         :param big_blind: the amount for the big blind
+        :param verbose: print the game status while playing (turn off for long simulations)
         """
         self.players = players
         self.num_of_deck = num_of_deck
@@ -38,17 +42,44 @@ class PokerGame:
 
         # Track how much each player has bet in the current round
         self.current_bets = {player.get_name(): 0 for player in self.players}
+        # Actions taken in the current round: "f" fold, "c" check/call, "r" raise
+        self.betting_history = []
 
         # TODO: For more realism, you might rotate the dealer button each hand
         #  but here we'll just treat player[0] as small blind, player[1] as big blind
         #  in every hand, for demonstration.
         self.sb_player_index = -1
 
+        self.verbose = verbose
+        self.hand_id = -1
+        # Callables notified of game events, see add_listener
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """
+        Register a callable notified as listener(event, game, **payload) for each game event:
+          - "hand_start": after hole cards are dealt, before blinds (payload: hand_id)
+          - "blind": after a blind is posted (payload: player, amount)
+          - "action": after a player's action is applied (payload: player, action,
+            amount of chips the action put in the pot)
+          - "pot_awarded": after the showdown winner is paid (payload: player, amount)
+          - "hand_end": after the showdown (payload: hand_id)
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _emit(self, event, **payload):
+        for listener in self._listeners:
+            listener(event, self, **payload)
+
     def start_new_hand(self):
         """
         Reset state for a new hand. Shuffle deck, clear pot, deal new hole cards, post blinds, etc.
         """
         self.deck = DeckOfCards(self.num_of_deck)
+        self.hand_id += 1
         self.sb_player_index = (self.sb_player_index + 1) % len(self.players)
         self.pot = 0
         self.community_cards = []
@@ -60,6 +91,7 @@ class PokerGame:
 
         # Clear previous bets
         self.current_bets = {player.get_name(): 0 for player in self.players}
+        self.betting_history = []
 
         # Deal 2 hole cards each
         for _ in range(2):
@@ -67,6 +99,8 @@ class PokerGame:
                 card = self.deck.deal()
                 player.receive_card(card)
 
+        self._emit("hand_start", hand_id=self.hand_id)
+
         # Collect blinds (player[0] -> small blind, player[1] -> big blind) if there are at least 2 players
         self.post_blinds()
 
@@ -93,9 +127,11 @@ class PokerGame:
         small_blind_player = self.players[sb_player_index]
         big_blind_player = self.players[bb_player_index]
 
-        self._player_places_amount(small_blind_player, self.small_blind)
+        amount = self._player_places_amount(small_blind_player, self.small_blind)
+        self._emit("blind", player=small_blind_player, amount=amount)
 
-        self._player_places_amount(big_blind_player, self.big_blind)
+        amount = self._player_places_amount(big_blind_player, self.big_blind)
+        self._emit("blind", player=big_blind_player, amount=amount)
 
     def proceed_to_next_betting_round(self):
         """
@@ -118,6 +154,7 @@ class PokerGame:
 
         # Reset each player's bet for the new betting round:
         self.current_bets = {player.get_name(): 0 for player in self.players}
+        self.betting_history = []
 
         #TODO: move sb index
 
@@ -157,13 +194,17 @@ class PokerGame:
                         "player_chips": player._chips,
                         "community_cards": self.community_cards,
                         "player_cards": player.get_cards(),
-                        "betting_round": self.current_betting_round.name
+                        "betting_round": self.current_betting_round.name,
+                        "betting_history": "".join(self.betting_history),
+                        # Seats after the small blind: 0 small blind, 1 big blind, ...
+                        "position": (action_index - self.sb_player_index) % num_players
                     }
 
                     action_str = player.decide_action(game_state)
                     parsed_action = self.__parse_action(action_str, player, highest_bet)
 
                     # Update pot and bets
+                    pot_before_action = self.pot
                     if parsed_action["type"] == "fold":
                         player.fold_hand()
                     elif parsed_action["type"] == "call":
@@ -189,6 +230,10 @@ class PokerGame:
                                 highest_bet = total_bet
                                 have_we_cycled_without_raise = False  # We had a raise
 
+                    self.betting_history.append(BETTING_HISTORY_CODES[parsed_action["type"]])
+                    self._emit("action", player=player, action=parsed_action,
+                               amount=self.pot - pot_before_action)
+
                 # Move to the next player
                 action_index = (action_index + 1) % num_players
 
@@ -271,7 +316,8 @@ class PokerGame:
             best_ranks[player.get_name()] = rank
 
         if not best_ranks:
-            print("No active players at showdown. Pot remains unawarded.")
+            if self.verbose:
+                print("No active players at showdown. Pot remains unawarded.")
             return
 
         # Suppose lower rank is better
@@ -281,8 +327,10 @@ class PokerGame:
         for player in self.players:
             if player.get_name() == winner:
                 player._chips += self.pot
+                self._emit("pot_awarded", player=player, amount=self.pot)
 
-        print(f"The winner is {winner} with rank {best_ranks[winner]}!")
+        if self.verbose:
+            print(f"The winner is {winner} with rank {best_ranks[winner]}!")
         self.pot = 0
 
     def play_hand(self):
@@ -296,31 +344,22 @@ class PokerGame:
           6) Showdown
         """
         self.start_new_hand()
-        self.print_status()
-
-        # Pre-Flop
-        self.betting_round_actions()
-        self.proceed_to_next_betting_round()
-        self.print_status()
+        self._print_status_if_verbose()
 
-        # Flop
-        self.betting_round_actions()
-        self.proceed_to_next_betting_round()
-        self.print_status()
-
-        # Turn
-        self.betting_round_actions()
-        self.proceed_to_next_betting_round()
-        self.print_status()
-
-        # River
-        self.betting_round_actions()
-        self.proceed_to_next_betting_round()
-        self.print_status()
+        # Pre-Flop, Flop, Turn, River
+        for _ in range(4):
+            self.betting_round_actions()
+            self.proceed_to_next_betting_round()
+            self._print_status_if_verbose()
 
         # Showdown
         self.showdown()
-        self.print_status()
+        self._print_status_if_verbose()
+        self._emit("hand_end", hand_id=self.hand_id)
+
+    def _print_status_if_verbose(self):
+        if self.verbose:
+            self.print_status()
 
     def print_status(self):
         """
@@ -353,8 +392,8 @@ class PokerGame:
         for p in self.players:
             status["players"].append({
                 "name": p.get_name(),
-                "chips": p.chips,
-                "folded": p.folded
+                "chips": p.get_chips(),
+                "folded": p._folded
             })
         return status
 
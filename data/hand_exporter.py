@@ -0,0 +1,227 @@
+import csv
+import os
+import queue
+import threading
+from array import array
+
+from Environment.PokerGame import BettingRound
+
+STREETS = (BettingRound.PRE_FLOP, BettingRound.FLOP, BettingRound.TURN, BettingRound.RIVER)
+NO_CARD = -1
+
+# Column name -> array typecode for the fixed-width columns (None means a string column)
+COLUMNS = {
+    "hand_id": "Q",
+    "seat": "B",
+    "hole_1": "b",
+    "hole_2": "b",
+    "board_1": "b",
+    "board_2": "b",
+    "board_3": "b",
+    "board_4": "b",
+    "board_5": "b",
+    "pre_flop_actions": None,
+    "flop_actions": None,
+    "turn_actions": None,
+    "river_actions": None,
+    "net_result": "d",
+}
+
+
+class HandExporter:
+    def __init__(self, out_dir, batch_size=65536, max_pending_batches=4, file_format="parquet",
+                 prefix="hands"):
+        """
+        Columnar exporter of simulated hands, fed by PokerGame events (register it with
+        game.add_listener). One row is written per seat per hand.
+
+        Rows are buffered into fixed-size record batches. Full batches are handed to a
+        background writer thread through a bounded queue, so I/O overlaps with the simulation
+        and memory stays around (max_pending_batches + 2) * batch_size rows however long the run.
+        Each batch becomes its own chunk file: <prefix>-00000.parquet, <prefix>-00001.parquet, ...
+
+        :param out_dir: directory the chunk files are written to (created if missing).
+        :param batch_size: number of rows per record batch / chunk file.
+        :param max_pending_batches: full batches allowed to wait for the writer before
+                                    the simulation blocks.
+        :param file_format: "parquet" (requires pyarrow) or "csv".
+        :param prefix: chunk file name prefix.
+        """
+        if file_format not in ("parquet", "csv"):
+            raise ValueError(f"Unsupported file format {file_format}")
+        if file_format == "parquet":
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError as e:
+                raise ImportError("Parquet export requires pyarrow, use file_format='csv' otherwise") from e
+
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.batch_size = batch_size
+        self.file_format = file_format
+        self.prefix = prefix
+
+        self._buffer = self._new_buffer()
+        self._num_rows = 0
+        self._hand = None  # Per-seat state of the hand being played
+        self._num_files = 0
+        self._writer_error = None
+        self._closed = False
+
+        self._queue = queue.Queue(maxsize=max_pending_batches)
+        self._writer = threading.Thread(target=self._write_loop, name="HandExporterWriter", daemon=True)
+        self._writer.start()
+
+    def __call__(self, event, game, **payload):
+        if event == "hand_start":
+            self._on_hand_start(game, payload["hand_id"])
+        elif event == "blind":
+            self._on_chips_moved(payload["player"], -payload["amount"])
+        elif event == "action":
+            self._on_action(game, payload["player"], payload["action"])
+            self._on_chips_moved(payload["player"], -payload["amount"])
+        elif event == "pot_awarded":
+            self._on_chips_moved(payload["player"], payload["amount"])
+        elif event == "hand_end":
+            self._on_hand_end(game)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Flush the partially filled batch, wait for the writer thread to finish and
+        re-raise any error it hit.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._num_rows:
+                self._flush()
+        finally:
+            # Always shut the writer down, even if it already failed
+            self._queue.put(None)
+            self._writer.join()
+        self._raise_writer_error()
+
+    def get_num_files(self):
+        return self._num_files
+
+    def _on_hand_start(self, game, hand_id):
+        self._hand = {"hand_id": hand_id, "seats": {}}
+        for seat, player in enumerate(game.players):
+            self._hand["seats"][player.get_name()] = {
+                "seat": seat,
+                "net_result": 0,
+                "hole": [card.to_int() for card in player.get_cards()],
+                "actions": {street: [] for street in STREETS},
+            }
+
+    def _on_action(self, game, player, action):
+        if self._hand is None or game.current_betting_round not in STREETS:
+            return
+        seat_state = self._hand["seats"][player.get_name()]
+        seat_state["actions"][game.current_betting_round].append(self._encode_action(action))
+
+    def _on_chips_moved(self, player, amount):
+        """
+        Net result is tracked from chip flow rather than stack differences,
+        which are NaN for players with unlimited chips.
+        """
+        if self._hand is not None:
+            self._hand["seats"][player.get_name()]["net_result"] += amount
+
+    def _on_hand_end(self, game):
+        if self._hand is None:
+            return
+        board = [card.to_int() for card in game.community_cards]
+        board += [NO_CARD] * (5 - len(board))
+        for seat_state in self._hand["seats"].values():
+            row = [self._hand["hand_id"], seat_state["seat"], *seat_state["hole"], *board]
+            row += [",".join(seat_state["actions"][street]) for street in STREETS]
+            row.append(seat_state["net_result"])
+            self._append_row(row)
+        self._hand = None
+
+    @staticmethod
+    def _encode_action(action):
+        """
+        Compact action code: "f" fold, "k" check, "c<amount>" call, "r<total_bet>" raise.
+        """
+        if action["type"] == "fold":
+            return "f"
+        if action["type"] == "check":
+            return "k"
+        if action["type"] == "call":
+            return f"c{action['amount']}"
+        return f"r{action['total_bet']}"
+
+    @staticmethod
+    def _new_buffer():
+        return {name: array(typecode) if typecode else [] for name, typecode in COLUMNS.items()}
+
+    def _append_row(self, row):
+        for column, value in zip(self._buffer.values(), row):
+            column.append(value)
+        self._num_rows += 1
+        if self._num_rows == self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        self._raise_writer_error()
+        # Blocks while the writer is max_pending_batches behind, which bounds memory
+        self._queue.put((self._num_files, self._buffer))
+        self._num_files += 1
+        self._buffer = self._new_buffer()
+        self._num_rows = 0
+
+    def _raise_writer_error(self):
+        if self._writer_error is not None:
+            raise RuntimeError("Hand exporter writer thread failed") from self._writer_error
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._writer_error is not None:
+                # Keep draining so the simulation is never blocked on a dead writer
+                continue
+            file_index, batch = item
+            try:
+                path = os.path.join(self.out_dir, f"{self.prefix}-{file_index:05d}.{self.file_format}")
+                if self.file_format == "parquet":
+                    self._write_parquet(path, batch)
+                else:
+                    self._write_csv(path, batch)
+            except Exception as e:
+                self._writer_error = e
+
+    @staticmethod
+    def _write_parquet(path, batch):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow_types = {"Q": pa.uint64(), "B": pa.uint8(), "b": pa.int8(), "d": pa.float64()}
+        arrays = {}
+        for name, typecode in COLUMNS.items():
+            column = batch[name]
+            if typecode is None:
+                arrays[name] = pa.array(column, type=pa.string())
+            else:
+                # Zero-copy view over the array.array memory
+                arrays[name] = pa.Array.from_buffers(arrow_types[typecode], len(column),
+                                                     [None, pa.py_buffer(column)])
+        pq.write_table(pa.table(arrays), path)
+
+    @staticmethod
+    def _write_csv(path, batch):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS.keys())
+            writer.writerows(zip(*batch.values()))
@@ -0,0 +1,405 @@
+import multiprocessing
+import random
+import time
+from itertools import combinations
+
+import numpy as np
+
+from Environment.DeckOfCards import DeckOfCards
+from Environment.PokerGame import BettingRound
+from design_strategies.decision_cache import board_texture_bucket, hole_card_class
+
+# Abstracted action set, also the column order of the regret / strategy tables
+FOLD, CALL, RAISE = 0, 1, 2
+NUM_ACTIONS = 3
+
+STREETS = (BettingRound.PRE_FLOP, BettingRound.FLOP, BettingRound.TURN, BettingRound.RIVER)
+# Number of community cards visible on each street
+BOARD_SIZES = (0, 3, 4, 5)
+
+# Legal action masks, and the matching action lists, indexed by (can_fold, can_raise)
+LEGAL_MASKS = {
+    (can_fold, can_raise): np.array([can_fold, True, can_raise])
+    for can_fold in (False, True) for can_raise in (False, True)
+}
+LEGAL_ACTIONS = {legality: tuple(np.flatnonzero(mask).tolist()) for legality, mask in LEGAL_MASKS.items()}
+
+
+class InfoSetTable:
+    def __init__(self, capacity=1024):
+        """
+        Regret and average-strategy tables of the CFR solver.
+        Rows of the NumPy arrays are info-set ids, columns the abstracted actions (fold, call, raise).
+        """
+        self.index = {}  # info-set key -> id
+        self.keys = []
+        self.regrets = np.zeros((capacity, NUM_ACTIONS))
+        self.strategy_sums = np.zeros((capacity, NUM_ACTIONS))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get_id(self, key):
+        info_set_id = self.index.get(key)
+        if info_set_id is None:
+            info_set_id = len(self.keys)
+            if info_set_id == len(self.regrets):
+                self.regrets = self._grow(self.regrets)
+                self.strategy_sums = self._grow(self.strategy_sums)
+            self.index[key] = info_set_id
+            self.keys.append(key)
+        return info_set_id
+
+    @staticmethod
+    def _grow(table):
+        return np.concatenate([table, np.zeros_like(table)])
+
+    def current_strategy(self, info_set_id, legal_mask):
+        """
+        Regret matching: play legal actions proportionally to their positive regret.
+        """
+        positive_regrets = np.where(legal_mask, np.maximum(self.regrets[info_set_id], 0), 0)
+        total = positive_regrets.sum()
+        if total > 0:
+            return positive_regrets / total
+        return legal_mask / legal_mask.sum()
+
+    def average_strategies(self):
+        """
+        :return: normalized average strategy of every info set (rows never reached are uniform).
+        """
+        sums = self.strategy_sums[:len(self)]
+        totals = sums.sum(axis=1, keepdims=True)
+        uniform = np.full_like(sums, 1 / NUM_ACTIONS)
+        return np.divide(sums, totals, out=uniform, where=totals > 0)
+
+    def snapshot(self):
+        """
+        :return: (keys, regrets, strategy_sums) trimmed to the used rows, to ship to worker processes.
+        """
+        size = len(self)
+        return list(self.keys), self.regrets[:size].copy(), self.strategy_sums[:size].copy()
+
+    @classmethod
+    def from_snapshot(cls, keys, regrets, strategy_sums):
+        table = cls(capacity=max(2 * len(keys), 1024))
+        for key in keys:
+            table.get_id(key)
+        table.regrets[:len(keys)] = regrets
+        table.strategy_sums[:len(keys)] = strategy_sums
+        return table
+
+    def deltas_since(self, snapshot_size, snapshot_regrets, snapshot_strategy_sums):
+        """
+        :return: (keys, regret deltas, strategy sum deltas) of the rows changed since the snapshot.
+        """
+        size = len(self)
+        regrets = self.regrets[:size].copy()
+        strategy_sums = self.strategy_sums[:size].copy()
+        regrets[:snapshot_size] -= snapshot_regrets
+        strategy_sums[:snapshot_size] -= snapshot_strategy_sums
+        changed = np.flatnonzero(np.any(regrets != 0, axis=1) | np.any(strategy_sums != 0, axis=1))
+        return [self.keys[i] for i in changed], regrets[changed], strategy_sums[changed]
+
+    def merge(self, keys, regret_deltas, strategy_sum_deltas):
+        """
+        Add the deltas computed by a worker process to this table.
+        """
+        ids = np.array([self.get_id(key) for key in keys], dtype=np.int64)
+        self.regrets[ids] += regret_deltas
+        self.strategy_sums[ids] += strategy_sum_deltas
+
+    def save(self, path):
+        np.savez_compressed(path, keys=np.array(self.keys), regrets=self.regrets[:len(self)],
+                            strategy_sums=self.strategy_sums[:len(self)])
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls.from_snapshot([str(key) for key in data["keys"]], data["regrets"], data["strategy_sums"])
+
+
+class CFRSolver:
+    def __init__(self, hand_evaluator, small_blind=10, big_blind=20, max_raises=3,
+                 num_strength_buckets=8, seed=None):
+        """
+        External-sampling Monte Carlo CFR for heads-up fixed-limit hold'em, following PokerGame's
+        blinds and BettingRound streets, with HandEvaluator deciding showdowns.
+
+        The betting order is PokerGame's rather than standard heads-up order: seat 0 acts first on
+        every street, and the blinds rotate between the seats (sampled on each iteration), so seat 0
+        opens pre-flop as the big blind with nothing to call in half of the hands. Showdowns use the
+        best 5 of the 7 cards.
+
+        Abstraction:
+          - actions: fold, check/call, raise by a fixed size (big blind pre-flop and on the flop,
+            twice the big blind on the turn and river), at most max_raises raises per street.
+          - info sets: street, position (0 small blind, 1 big blind), hand bucket (hole-card class
+            pre-flop, strength bucket and board texture after) and the actions taken on the
+            current street.
+
+        :param hand_evaluator: a HandEvaluator instance
+        :param small_blind: the amount for the small blind
+        :param big_blind: the amount for the big blind
+        :param max_raises: maximum number of raises per street
+        :param num_strength_buckets: number of buckets the post-flop hand strength is split into
+        :param seed: seed of the solver's random number generator
+        """
+        self._config = {
+            "hand_evaluator": hand_evaluator,
+            "small_blind": small_blind,
+            "big_blind": big_blind,
+            "max_raises": max_raises,
+            "num_strength_buckets": num_strength_buckets,
+        }
+        self.evaluator = hand_evaluator
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.max_raises = max_raises
+        self.num_strength_buckets = num_strength_buckets
+
+        self.table = InfoSetTable()
+        self.iterations = 0
+        self._rng = random.Random(seed)
+
+    def get_raise_size(self, street):
+        return self.big_blind if street in (BettingRound.PRE_FLOP, BettingRound.FLOP) else 2 * self.big_blind
+
+    def get_info_set_key(self, street, position, hand_bucket, history):
+        return f"{street.name}|{position}|{hand_bucket}|{history}"
+
+    def get_hand_bucket(self, hole_cards, community_cards):
+        """
+        Hole-card class pre-flop, "<strength bucket>:<board texture>" once there is a board.
+        """
+        if not community_cards:
+            return hole_card_class(hole_cards)
+        best_hand = self._best_hand(list(hole_cards) + list(community_cards))
+        strength = self.evaluator.get_hand_probability_of_winning(best_hand)
+        strength_bucket = min(int(strength * self.num_strength_buckets), self.num_strength_buckets - 1)
+        return f"{strength_bucket}:{board_texture_bucket(community_cards)}"
+
+    def _best_hand(self, cards):
+        """
+        Best 5-card hand out of the given cards (lower rank is better).
+        """
+        return min(combinations(cards, 5), key=self.evaluator.get_hand_ranking)
+
+    #############################
+    # Training
+    #############################
+
+    def train(self, iterations, num_processes=1, merge_every=10_000, verbose=False):
+        """
+        Run MCCFR iterations, each traversing the tree once for each player.
+
+        :param iterations: number of iterations to run
+        :param num_processes: worker processes sampling iterations in parallel
+        :param merge_every: iterations run by all workers between two merges of their tables
+        :param verbose: print the stats once done
+        :return: dict with iterations, seconds, iterations_per_sec and num_info_sets
+        """
+        start = time.perf_counter()
+        if num_processes <= 1:
+            self._run_iterations(self.table, iterations, self._rng)
+        else:
+            with multiprocessing.Pool(num_processes, initializer=_init_worker, initargs=(self._config,)) as pool:
+                done = 0
+                while done < iterations:
+                    batch = min(merge_every, iterations - done)
+                    snapshot = self.table.snapshot()
+                    tasks = [
+                        (snapshot, batch // num_processes + (worker < batch % num_processes),
+                         self._rng.getrandbits(64))
+                        for worker in range(num_processes)
+                    ]
+                    for deltas in pool.map(_run_worker, tasks):
+                        self.table.merge(*deltas)
+                    done += batch
+        self.iterations += iterations
+
+        seconds = time.perf_counter() - start
+        stats = {
+            "iterations": iterations,
+            "seconds": seconds,
+            "iterations_per_sec": iterations / seconds if seconds > 0 else float("inf"),
+            "num_info_sets": len(self.table),
+        }
+        if verbose:
+            print(f"{iterations} iterations in {seconds:.1f}s ({stats['iterations_per_sec']:.0f} it/s), "
+                  f"{stats['num_info_sets']} info sets")
+        return stats
+
+    def _run_iterations(self, table, iterations, rng):
+        for _ in range(iterations):
+            deal = self._sample_deal(rng)
+            _, _, sb_seat = deal
+            contributions = [self.small_blind, self.big_blind]
+            if sb_seat == 1:
+                contributions.reverse()
+            for traverser in (0, 1):
+                self._traverse(table, deal, rng, traverser, 0, "", contributions, 0)
+
+    def _sample_deal(self, rng):
+        """
+        Pick the small blind seat, deal hole cards and board, and precompute each seat's hand bucket
+        per street and the showdown result (1 if seat 0 wins, -1 if seat 1 wins, 0 for a tie).
+        """
+        sb_seat = rng.randrange(2)
+        deck = DeckOfCards(1)
+        rng.shuffle(deck.cards)
+        holes = [[deck.deal(), deck.deal()], [deck.deal(), deck.deal()]]
+        board = [deck.deal() for _ in range(5)]
+
+        buckets = [[self.get_hand_bucket(hole, board[:size]) for size in BOARD_SIZES] for hole in holes]
+        ranks = [self.evaluator.get_hand_ranking(self._best_hand(hole + board)) for hole in holes]
+        showdown = (ranks[0] < ranks[1]) - (ranks[0] > ranks[1])
+        return buckets, showdown, sb_seat
+
+    def _traverse(self, table, deal, rng, traverser, street_index, history, contributions, raises):
+        """
+        External sampling: explore every action of the traverser, sample the opponent's.
+        :return: expected utility (chips won or lost) of the traverser.
+        """
+        buckets, _, sb_seat = deal
+        player = len(history) % 2  # Seat 0 opens every street, as in PokerGame
+        to_call = max(contributions) - contributions[player]
+        legality = (to_call > 0, raises < self.max_raises)
+        legal_mask = LEGAL_MASKS[legality]
+
+        position = (player - sb_seat) % 2
+        key = self.get_info_set_key(STREETS[street_index], position, buckets[player][street_index], history)
+        info_set_id = table.get_id(key)
+        strategy = table.current_strategy(info_set_id, legal_mask)
+
+        if player != traverser:
+            table.strategy_sums[info_set_id] += strategy
+            action = rng.choices(range(NUM_ACTIONS), weights=strategy)[0]
+            return self._apply_action(table, deal, rng, traverser, street_index, history, contributions,
+                                      raises, player, action)
+
+        utilities = np.zeros(NUM_ACTIONS)
+        for action in LEGAL_ACTIONS[legality]:
+            utilities[action] = self._apply_action(table, deal, rng, traverser, street_index, history,
+                                                   contributions, raises, player, action)
+        node_utility = strategy @ utilities
+        table.regrets[info_set_id] += np.where(legal_mask, utilities - node_utility, 0)
+        return node_utility
+
+    def _apply_action(self, table, deal, rng, traverser, street_index, history, contributions, raises,
+                      player, action):
+        opponent = 1 - traverser
+        if action == FOLD:
+            return -contributions[traverser] if player == traverser else contributions[opponent]
+
+        contributions = list(contributions)
+        contributions[player] = max(contributions)
+        if action == RAISE:
+            contributions[player] += self.get_raise_size(STREETS[street_index])
+            return self._traverse(table, deal, rng, traverser, street_index, history + "r", contributions,
+                                  raises + 1)
+
+        # A call or check closes the street unless it is the first action on it
+        if not history:
+            return self._traverse(table, deal, rng, traverser, street_index, "c", contributions, raises)
+        if street_index < len(STREETS) - 1:
+            return self._traverse(table, deal, rng, traverser, street_index + 1, "", contributions, 0)
+
+        _, showdown, _ = deal
+        winner_sign = showdown if traverser == 0 else -showdown
+        if winner_sign > 0:
+            return contributions[opponent]
+        if winner_sign < 0:
+            return -contributions[traverser]
+        return 0
+
+    #############################
+    # Policy export
+    #############################
+
+    def get_decider(self):
+        """
+        :return: the trained average strategy as a decider usable by Player.
+        """
+        return CFRPolicy(self)
+
+    def save(self, path):
+        self.table.save(path)
+
+    def load(self, path):
+        self.table = InfoSetTable.load(path)
+
+
+class CFRPolicy:
+    def __init__(self, solver, seed=None):
+        """
+        Decider playing the average strategy of a CFR solver (snapshot taken at creation).
+        Unknown info sets, e.g. betting histories outside the abstraction, fall back to check/call.
+        """
+        self._solver = solver
+        self._index = dict(solver.table.index)
+        self._strategies = solver.table.average_strategies()
+        self._rng = random.Random(seed)
+
+    def __call__(self, game_state):
+        street = BettingRound[game_state["betting_round"]]
+        hand_bucket = self._solver.get_hand_bucket(game_state["player_cards"], game_state["community_cards"])
+        key = self._solver.get_info_set_key(street, game_state["position"], hand_bucket,
+                                            game_state["betting_history"])
+
+        info_set_id = self._index.get(key)
+        action = CALL
+        if info_set_id is not None:
+            action = self._rng.choices(range(NUM_ACTIONS), weights=self._strategies[info_set_id])[0]
+
+        if action == FOLD and game_state["to_call"] > 0:
+            return "fold"
+        if action == RAISE:
+            return f"raise:{self._solver.get_raise_size(street)}"
+        return "call" if game_state["to_call"] > 0 else "check"
+
+
+#############################
+# Worker processes
+#############################
+
+_worker_solver = None
+
+
+def _init_worker(config):
+    global _worker_solver
+    _worker_solver = CFRSolver(**config)
+
+
+def _run_worker(task):
+    snapshot, iterations, seed = task
+    keys, regrets, strategy_sums = snapshot
+    table = InfoSetTable.from_snapshot(keys, regrets, strategy_sums)
+    _worker_solver._run_iterations(table, iterations, random.Random(seed))
+    return table.deltas_since(len(keys), regrets, strategy_sums)
+
+
+if __name__ == "__main__":
+    from Environment.Player import Player
+    from Environment.PokerGame import PokerGame
+    from Environment.hand_evaluator import HandEvaluator
+
+    def always_call_decider(game_state):
+        return "call" if game_state["to_call"] > 0 else "check"
+
+    evaluator = HandEvaluator(f_path="../data/hand_rankings.csv")
+    solver = CFRSolver(evaluator, seed=0)
+    stats = solver.train(20_000, num_processes=4, merge_every=5_000)
+    print(f"{stats['iterations']} iterations in {stats['seconds']:.1f}s "
+          f"({stats['iterations_per_sec']:.0f} it/s), {stats['num_info_sets']} info sets")
+
+    players = [
+        Player("CFR", None, None, solver.get_decider(), start_money=100_000),
+        Player("Caller", None, None, always_call_decider, start_money=100_000),
+    ]
+    game = PokerGame(players, evaluator, verbose=False)
+    for _ in range(1_000):
+        game.play_hand()
+
+    for p in players:
+        print(f"{p.get_name()} has {p.get_chips()} chips.")
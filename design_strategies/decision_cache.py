@@ -0,0 +1,160 @@
+import json
+import os
+from collections import Counter, OrderedDict
+
+from Environment.DeckOfCards import CARD_VALUES
+
+
+#############################
+# game_state abstraction
+#############################
+
+def hole_card_class(cards):
+    """
+    Canonical class of two hole cards, one of the 169 starting hands.
+    e.g. "QQ", "AKs" (suited), "T9o" (offsuit)
+    """
+    high, low = sorted(cards, key=lambda card: CARD_VALUES.index(card.get_value()), reverse=True)
+    if high.get_value() == low.get_value():
+        return high.get_value() * 2
+    suited = "s" if high.get_suit() == low.get_suit() else "o"
+    return f"{high.get_value()}{low.get_value()}{suited}"
+
+
+def board_texture_bucket(cards):
+    """
+    Small int describing the board texture (0 for an empty board):
+      - bit 0: the board is paired
+      - bits 1-2: suit level, 0 rainbow, 1 two of a suit (flush draw), 2 three or more (flush possible)
+      - bit 3: connected, three distinct ranks within a five rank window (straight possible)
+    """
+    if not cards:
+        return 0
+    ranks = sorted({CARD_VALUES.index(card.get_value()) for card in cards})
+    # The ace also plays low for the wheel
+    if ranks[-1] == len(CARD_VALUES) - 1:
+        ranks.insert(0, -1)
+
+    paired = len(ranks) - (ranks[0] == -1) < len(cards)
+    max_suit_count = max(Counter(card.get_suit() for card in cards).values())
+    suit_level = 2 if max_suit_count >= 3 else max_suit_count - 1
+    connected = any(ranks[i + 2] - ranks[i] <= 4 for i in range(len(ranks) - 2))
+    return int(paired) | suit_level << 1 | int(connected) << 3
+
+
+def pot_odds_bucket(to_call, pot, num_buckets=10):
+    """
+    0 when there is nothing to call, otherwise 1..num_buckets from the pot odds to_call / (pot + to_call).
+    """
+    if to_call <= 0:
+        return 0
+    pot_odds = to_call / (pot + to_call)
+    return min(int(pot_odds * num_buckets), num_buckets - 1) + 1
+
+
+#############################
+# Cached decider
+#############################
+
+class CachedDecider:
+    def __init__(self, decider_fn, max_size=100_000, num_pot_odds_buckets=10, cache_path=None):
+        """
+        Opt-in memoization wrapper for Player decider functions. Usable anywhere a decider is,
+        e.g. Player("Alice", None, None, CachedDecider(equity_decider), start_money=1000)
+
+        Decisions are cached on an abstraction of game_state: betting round, canonical hole-card
+        class, board texture bucket and bucketed pot odds. Only wrap deciders that are (close to)
+        pure functions of that abstraction; a random decider would get its first answer frozen.
+
+        :param decider_fn: the decider to wrap, game_state -> action string.
+        :param max_size: maximum number of cached decisions, least recently used ones are evicted.
+        :param num_pot_odds_buckets: number of buckets the pot odds are split into.
+        :param cache_path: optional JSON file the cache is loaded from (if it exists) and the default
+                           path of save(). Saving is manual, call save() at the end of a run.
+        """
+        self._decider_fn = decider_fn
+        self.max_size = max_size
+        self.num_pot_odds_buckets = num_pot_odds_buckets
+        self.cache_path = cache_path
+
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        if cache_path is not None and os.path.exists(cache_path):
+            self.load(cache_path)
+
+    def __call__(self, game_state):
+        key = self.get_key(game_state)
+        action = self._cache.get(key)
+        if action is not None:
+            self._hits += 1
+            self._cache.move_to_end(key)
+            return action
+
+        self._misses += 1
+        action = self._decider_fn(game_state)
+        self._store(key, action)
+        return action
+
+    def get_key(self, game_state):
+        """
+        :return: the abstracted game_state the decision is cached on.
+        """
+        return (
+            game_state["betting_round"],
+            hole_card_class(game_state["player_cards"]),
+            board_texture_bucket(game_state["community_cards"]),
+            pot_odds_bucket(game_state["to_call"], game_state["pot"], self.num_pot_odds_buckets),
+        )
+
+    def _store(self, key, action):
+        self._cache[key] = action
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self._evictions += 1
+
+    def get_stats(self):
+        """
+        :return: dict with hits, misses, evictions, size and hit_rate of the cache.
+        """
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "size": len(self._cache),
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self._cache.clear()
+
+    def save(self, path=None):
+        """
+        Persist the cached decisions (least recently used first) to a JSON file,
+        along with the number of pot odds buckets their keys were computed with.
+        """
+        path = path or self.cache_path
+        if path is None:
+            raise ValueError("No path given to save the decision cache to")
+        with open(path, "w") as f:
+            json.dump({
+                "num_pot_odds_buckets": self.num_pot_odds_buckets,
+                "decisions": [[list(key), action] for key, action in self._cache.items()],
+            }, f)
+
+    def load(self, path):
+        """
+        Load decisions saved by save(), on top of the current ones.
+        Raises ValueError if they were saved with a different number of pot odds buckets.
+        """
+        with open(path, "r") as f:
+            saved = json.load(f)
+        if saved["num_pot_odds_buckets"] != self.num_pot_odds_buckets:
+            raise ValueError(f"Decision cache {path} was saved with {saved['num_pot_odds_buckets']} pot odds "
+                             f"buckets, expected {self.num_pot_odds_buckets}")
+        for key, action in saved["decisions"]:
+            self._store(tuple(key), action)